@@ -5,14 +5,21 @@ Handles all interactions with the Granola API including documents,
 transcripts, and document lists with intelligent caching and error handling.
 """
 
-import json
-import requests
+import base64
+import os
+import random
+import threading
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, TYPE_CHECKING
 import logging
 
+if TYPE_CHECKING:
+    import requests
+
+from . import jsonio
 from .config import GranolaConfig
 
 
@@ -21,6 +28,56 @@ class GranolaAPIError(Exception):
     pass
 
 
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting the global request rate
+
+    Tokens accrue at `rate` per second up to `burst`, so a sync that
+    pauses between requests never sleeps at all, while a burst of
+    concurrent fetches is smoothed to the configured rate. penalize()
+    lets the API client push a server-mandated backoff (Retry-After)
+    onto every worker at once.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self._rate = rate  # tokens per second; <= 0 disables limiting
+        self._burst = max(1, burst)
+        self._tokens = float(self._burst)
+        self._updated = time.monotonic()
+        self._penalty_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        if self._rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._burst,
+                    self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+
+                wait = self._penalty_until - now
+                if wait <= 0:
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        return
+                    wait = (1.0 - self._tokens) / self._rate
+
+            time.sleep(wait)
+
+    def penalize(self, seconds: float):
+        """Pause all acquirers for at least `seconds` (e.g. from Retry-After)"""
+        with self._lock:
+            self._penalty_until = max(
+                self._penalty_until, time.monotonic() + seconds
+            )
+
+
 class GranolaAPI:
     """Client for interacting with the Granola API"""
     
@@ -28,81 +85,201 @@ class GranolaAPI:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self._access_token: Optional[str] = None
-        
+        self._token_expires_at = 0.0
+        self._session = self._build_session()
+        # request_delay expresses the minimum spacing between requests;
+        # as a bucket rate that is 1/delay tokens per second, with burst
+        # headroom for the concurrent transcript fetchers
+        delay = config.api.request_delay
+        self._bucket = TokenBucket(
+            rate=(1.0 / delay) if delay > 0 else 0.0,
+            burst=config.api.concurrency
+        )
+        self._rng = random.Random()  # Seedable in tests for deterministic backoff
+
+    def _build_session(self) -> "requests.Session":
+        """Create a pooled HTTP session reused across all API calls"""
+        # Imported lazily so importing the package doesn't pay the
+        # requests/urllib3/ssl import cost up front
+        import requests
+
+        session = requests.Session()
+
+        # Keep-alive connection pool sized to the configured fan-out so
+        # concurrent transcript fetches never queue on or discard
+        # pooled connections; retries are handled in _make_request
+        pool_size = max(16, self.config.api.concurrency)
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=0
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        # Static headers live on the session; Authorization is set when
+        # the access token is loaded. Compression is requested explicitly
+        # so large document pages arrive gzipped regardless of requests'
+        # defaults (urllib3 decompresses transparently).
+        session.headers['Content-Type'] = 'application/json'
+        session.headers['Accept-Encoding'] = 'gzip, deflate'
+        return session
+
+    def close(self):
+        """Close the HTTP session and its pooled connections"""
+        self._session.close()
+
     def _load_credentials(self) -> str:
         """Load Granola API credentials from supabase.json"""
         try:
-            with open(self.config.paths.credentials, 'r') as f:
-                creds = json.load(f)
-            
+            with open(self.config.paths.credentials, 'rb') as f:
+                creds = jsonio.loads(f.read())
+
             # Try WorkOS token first, then Cognito
-            workos_tokens = json.loads(creds.get('workos_tokens', '{}'))
+            workos_tokens = jsonio.loads(creds.get('workos_tokens', '{}'))
             if 'access_token' in workos_tokens:
-                return workos_tokens['access_token']
-            
-            # Fallback to Cognito tokens
-            cognito_tokens = json.loads(creds['cognito_tokens'])
-            return cognito_tokens['access_token']
-            
-        except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
+                token = workos_tokens['access_token']
+            else:
+                # Fallback to Cognito tokens
+                cognito_tokens = jsonio.loads(creds['cognito_tokens'])
+                token = cognito_tokens['access_token']
+
+            # Record expiry alongside the token so refresh decisions are
+            # deterministic rather than reactive to 401s
+            self._token_expires_at = self._decode_token_expiry(token)
+            return token
+
+        except (FileNotFoundError, ValueError, KeyError) as e:
             raise GranolaAPIError(f"Failed to load credentials: {e}")
     
+    def _decode_token_expiry(self, token: str) -> float:
+        """Read the exp claim from a JWT access token (no signature check needed client-side)"""
+        try:
+            payload_segment = token.split('.')[1]
+            payload = jsonio.loads(base64.urlsafe_b64decode(payload_segment + '=='))
+            return float(payload['exp'])
+        except (IndexError, KeyError, TypeError, ValueError):
+            # Not a parseable JWT - treat as non-expiring and rely on the 401 fallback
+            return float('inf')
+
     @property
     def access_token(self) -> str:
-        """Get access token, loading if necessary"""
-        if self._access_token is None:
+        """Get access token, refreshing a minute before expiry"""
+        if self._access_token is None or time.time() > self._token_expires_at - 60:
             self._access_token = self._load_credentials()
+            self._session.headers['Authorization'] = f'Bearer {self._access_token}'
         return self._access_token
-    
+
     def _make_request(self, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Make authenticated request to Granola API with retry logic"""
-        headers = {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json'
-        }
-        
+        import requests
+
+        # Ensure the session carries a valid Authorization header
+        _ = self.access_token
+        self._bucket.acquire()
+
+        # Total time we're willing to spend sleeping between retries,
+        # so a flapping call can't stall the sync indefinitely
+        retry_budget = self.config.error_handling.get('max_total_retry_seconds', 30.0)
+        total_slept = 0.0
+
         for attempt in range(self.config.api.max_retries):
             try:
-                response = requests.post(
-                    url, 
-                    json=payload, 
-                    headers=headers,
+                response = self._session.post(
+                    url,
+                    json=payload,
                     timeout=self.config.api.timeout
                 )
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    # Parse the raw bytes directly (orjson-accelerated when
+                    # available), skipping the str decode response.json() does
+                    data = jsonio.loads(response.content)
                     if self._validate_api_response(data):
                         return data
                     else:
                         self.logger.warning(f"Invalid API response structure: {url}")
                         
                 elif response.status_code == 401:
-                    # Token might be expired, reload and retry once
+                    # Shouldn't happen now that refresh is driven by the
+                    # token's exp claim; kept as a safety net for
+                    # non-JWT tokens or server-side revocation
                     if attempt == 0:
+                        self.logger.warning("Unexpected 401 despite unexpired token, reloading credentials")
                         self._access_token = None  # Force reload
+                        _ = self.access_token  # Refresh session Authorization header
                         continue
                     else:
                         raise GranolaAPIError(f"Authentication failed: {response.status_code}")
-                        
+
+                elif response.status_code in (429, 503) and 'Retry-After' in response.headers:
+                    # Server told us how long to back off; the header may
+                    # be delta-seconds or an HTTP-date. An unparseable
+                    # value falls through to the normal backoff below.
+                    retry_after = self._parse_retry_after(response.headers['Retry-After'])
+                    if retry_after is None:
+                        self.logger.warning(f"Rate limited ({response.status_code}) with unparseable Retry-After, using backoff")
+                    else:
+                        retry_after = min(retry_after, self.config.error_handling['retry_max_delay'])
+                        if total_slept + retry_after > retry_budget:
+                            self.logger.warning(f"Retry budget exhausted waiting on {url}")
+                            break
+                        self.logger.warning(f"Rate limited ({response.status_code}), waiting {retry_after}s per Retry-After")
+                        # Hold back the other workers too, not just this call
+                        self._bucket.penalize(retry_after)
+                        time.sleep(retry_after)
+                        total_slept += retry_after
+                        continue
+
                 else:
                     self.logger.warning(f"API request failed: {response.status_code} - {response.text}")
-                    
-                # Wait before retry with exponential backoff
+
+                # Wait before retry with full-jitter exponential backoff, so
+                # concurrent clients don't retry in lockstep
                 if attempt < self.config.api.max_retries - 1:
-                    wait_time = min(
+                    wait_time = self._rng.uniform(0, min(
                         self.config.error_handling['retry_base_delay'] * (2 ** attempt),
                         self.config.error_handling['retry_max_delay']
-                    )
+                    ))
+                    wait_time = min(wait_time, retry_budget - total_slept)
+                    if wait_time < 0:
+                        break
                     time.sleep(wait_time)
-                    
+                    total_slept += wait_time
+
             except requests.exceptions.RequestException as e:
                 self.logger.warning(f"Request exception on attempt {attempt + 1}: {e}")
                 if attempt < self.config.api.max_retries - 1:
-                    time.sleep(self.config.error_handling['retry_base_delay'])
+                    wait_time = min(self.config.error_handling['retry_base_delay'], retry_budget - total_slept)
+                    if wait_time < 0:
+                        break
+                    time.sleep(wait_time)
+                    total_slept += wait_time
         
         raise GranolaAPIError(f"Failed to get valid response from {url} after {self.config.api.max_retries} attempts")
-    
+
+    @staticmethod
+    def _parse_retry_after(value: str) -> Optional[float]:
+        """
+        Parse a Retry-After header into seconds to wait
+
+        Accepts both forms RFC 7231 allows - delta-seconds and an
+        HTTP-date - and returns None when the value is neither.
+        """
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
     def _validate_api_response(self, data: Dict[str, Any]) -> bool:
         """Validate API response structure"""
         if not self.config.data['validate_api_responses']:
@@ -131,25 +308,30 @@ class GranolaAPI:
                 
                 if not documents:
                     break
-                
+
+                # Scan newest-first so one stale document ends the whole walk
+                documents.sort(key=lambda d: d.get('created_at', ''), reverse=True)
+
                 # Filter documents by date
                 recent_documents = []
+                reached_cutoff = False
                 for doc in documents:
-                    if self._is_document_recent(doc, since_date):
+                    is_recent, created_dt = self._is_document_recent(doc, since_date)
+                    if is_recent:
                         recent_documents.append(doc)
-                    elif self._get_document_date(doc, 'created_at') < since_date:
-                        # If we're seeing documents older than our cutoff, we can stop
+                    elif created_dt and created_dt < since_date:
+                        # Everything past this point predates the cutoff
+                        reached_cutoff = True
                         break
-                
+
                 all_documents.extend(recent_documents)
                 offset += self.config.api.batch_size
-                
-                # If we didn't find any recent documents in this batch, we can stop
-                if not recent_documents:
+
+                # Stop once we've hit the cutoff or an all-stale batch -
+                # requesting further pages would only return older documents
+                if reached_cutoff or not recent_documents:
                     break
-                
-                time.sleep(self.config.api.request_delay)
-                
+
             except GranolaAPIError as e:
                 if self.config.should_continue_on_error('document'):
                     self.logger.error(f"Error fetching documents batch at offset {offset}: {e}")
@@ -160,16 +342,22 @@ class GranolaAPI:
         self.logger.info(f"Found {len(all_documents)} documents to sync")
         return all_documents
     
-    def _is_document_recent(self, doc: Dict[str, Any], since_date: datetime) -> bool:
-        """Check if document was created or updated since the given date"""
+    def _is_document_recent(self, doc: Dict[str, Any], since_date: datetime) -> Tuple[bool, Optional[datetime]]:
+        """
+        Check if document was created or updated since the given date
+
+        Returns:
+            Tuple of (is_recent, created_dt) so callers can reuse the
+            parsed creation date instead of re-parsing it
+        """
         try:
             created_dt = self._get_document_date(doc, 'created_at')
             updated_dt = self._get_document_date(doc, 'updated_at') or created_dt
-            
-            return created_dt >= since_date or updated_dt >= since_date
+
+            return (created_dt >= since_date or updated_dt >= since_date), created_dt
         except:
             # If we can't parse the date, include it to be safe
-            return True
+            return True, None
     
     def _get_document_date(self, doc: Dict[str, Any], field: str) -> Optional[datetime]:
         """Extract and parse date field from document"""
@@ -179,8 +367,8 @@ class GranolaAPI:
             
         try:
             # Handle ISO format with Z timezone
-            if date_str.endswith('Z'):
-                date_str = date_str.replace('Z', '+00:00')
+            if date_str[-1] == 'Z':
+                date_str = date_str[:-1] + '+00:00'
             return datetime.fromisoformat(date_str)
         except ValueError:
             return None
@@ -229,17 +417,17 @@ class GranolaAPI:
     def load_participant_data(self) -> Dict[str, List[Dict[str, Any]]]:
         """Load participant data from user preferences"""
         try:
-            with open(self.config.paths.user_preferences, 'r') as f:
-                data = json.load(f)
-            
+            with open(self.config.paths.user_preferences, 'rb') as f:
+                data = jsonio.loads(f.read())
+
             # Parse the JSON string inside the preferences
-            prefs = json.loads(data['preferences'])
+            prefs = jsonio.loads(data['preferences'])
             participants = prefs['state'].get('suggestedParticipants', {})
-            
+
             self.logger.info(f"Loaded participant data for {len(participants)} document lists")
             return participants
-            
-        except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
+
+        except (FileNotFoundError, ValueError, KeyError) as e:
             self.logger.warning(f"Could not load participant data: {e}")
             return {}
     
@@ -253,14 +441,27 @@ class GranolaAPI:
                     timestamp = f.read().strip()
                 return datetime.fromisoformat(timestamp)
             except (ValueError, IOError):
-                pass
-        
+                # Corrupt or truncated file: the mtime still records
+                # when the last sync ran, which beats re-fetching the
+                # whole default lookback window
+                try:
+                    return datetime.fromtimestamp(sync_file.stat().st_mtime)
+                except OSError:
+                    pass
+
         # Default to configured lookback if no sync file exists
         return datetime.now() - timedelta(days=self.config.sync['default_lookback_days'])
-    
+
     def update_last_sync_time(self):
-        """Update the last sync timestamp"""
+        """Update the last sync timestamp atomically"""
         sync_file = self.config.paths.last_sync_file
-        
-        with open(sync_file, 'w') as f:
-            f.write(datetime.now().isoformat())
\ No newline at end of file
+        tmp_file = sync_file.with_suffix('.tmp')
+
+        # Write-fsync-rename so a mid-write kill can't leave a truncated
+        # timestamp behind
+        with open(tmp_file, 'w') as f:
+            f.write(datetime.now().isoformat())
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_file, sync_file)
\ No newline at end of file
@@ -5,11 +5,10 @@ Handles loading, validation, and access to configuration settings
 from granola_config.yaml with environment variable overrides.
 """
 
-import yaml
 import os
 from pathlib import Path
-from typing import Dict, Any, Optional
-from dataclasses import dataclass
+from typing import ClassVar, Dict, Any, Optional, Set
+from dataclasses import dataclass, fields
 
 
 @dataclass
@@ -21,6 +20,7 @@ class APIConfig:
     batch_size: int
     max_retries: int
     timeout: int
+    concurrency: int = 16
 
 
 @dataclass
@@ -33,20 +33,23 @@ class PathConfig:
     obsidian_vault: Path
     log_directory: Path
     backup_directory: Path
-    
+
+    # Directories already created by this process, so repeated config
+    # construction (e.g. reload()) skips the no-op mkdir syscalls
+    _ensured_dirs: ClassVar[Set[Path]] = set()
+
     def __post_init__(self):
         """Expand user paths and ensure directories exist"""
-        for field_name in ['credentials', 'user_preferences', 'last_sync_file', 
-                          'document_mapping', 'obsidian_vault', 'log_directory', 'backup_directory']:
-            path = getattr(self, field_name)
+        for field in fields(self):
+            path = getattr(self, field.name)
             if isinstance(path, str):
-                expanded_path = Path(path).expanduser().resolve()
-                setattr(self, field_name, expanded_path)
-        
+                setattr(self, field.name, Path(path).expanduser().resolve())
+
         # Ensure directories exist (but not files)
-        self.obsidian_vault.mkdir(parents=True, exist_ok=True)
-        self.log_directory.mkdir(parents=True, exist_ok=True)
-        self.backup_directory.mkdir(parents=True, exist_ok=True)
+        for directory in (self.obsidian_vault, self.log_directory, self.backup_directory):
+            if directory not in self._ensured_dirs:
+                directory.mkdir(parents=True, exist_ok=True)
+                self._ensured_dirs.add(directory)
 
 
 class GranolaConfig:
@@ -78,9 +81,23 @@ class GranolaConfig:
         self.logging = self._raw_config['logging']
         self.error_handling = self._raw_config['error_handling']
         self.development = self._raw_config['development']
+
+        # Precompute hot-path lookups so per-request calls are plain dict gets
+        self._endpoint_urls = {
+            name: f"{self.api.base_url}{path}"
+            for name, path in self.api.endpoints.items()
+        }
+        self._continue_on = {
+            key: value for key, value in self.error_handling.items()
+            if key.startswith('continue_on_')
+        }
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from YAML file with environment variable substitution"""
+        # Imported lazily so config-free code paths (--help, --version)
+        # don't pay the PyYAML import cost
+        import yaml
+
         if not self.config_path.exists():
             raise FileNotFoundError(f"Configuration file not found: {self.config_path}")
         
@@ -118,10 +135,10 @@ class GranolaConfig:
     
     def get_api_url(self, endpoint_name: str) -> str:
         """Get full API URL for a specific endpoint"""
-        if endpoint_name not in self.api.endpoints:
+        try:
+            return self._endpoint_urls[endpoint_name]
+        except KeyError:
             raise ValueError(f"Unknown API endpoint: {endpoint_name}")
-        
-        return f"{self.api.base_url}{self.api.endpoints[endpoint_name]}"
     
     def get_safe_filename_pattern(self) -> str:
         """Get regex pattern for safe filename generation"""
@@ -145,8 +162,7 @@ class GranolaConfig:
     
     def should_continue_on_error(self, error_type: str) -> bool:
         """Check if sync should continue on specific error types"""
-        field_name = f'continue_on_{error_type}_error'
-        return self.error_handling.get(field_name, True)
+        return self._continue_on.get(f'continue_on_{error_type}_error', True)
     
     def reload(self):
         """Reload configuration from file"""
@@ -0,0 +1,36 @@
+"""
+JSON helpers with optional orjson acceleration
+
+Uses orjson when it is installed (2-3x faster parsing, ~5x faster
+serialization) and falls back to the standard library otherwise, so it
+stays an optional dependency.
+"""
+
+import json as _json
+from typing import Any, Union
+
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON from a str or bytes payload"""
+    if _orjson is not None:
+        return _orjson.loads(data)
+    return _json.loads(data)
+
+
+def dumps_compact(obj: Any) -> str:
+    """Serialize to a compact JSON string"""
+    if _orjson is not None:
+        return _orjson.dumps(obj).decode('utf-8')
+    return _json.dumps(obj)
+
+
+def dumps_indented(obj: Any) -> bytes:
+    """Serialize to 2-space-indented JSON bytes, suitable for file writes"""
+    if _orjson is not None:
+        return _orjson.dumps(obj, option=_orjson.OPT_INDENT_2)
+    return _json.dumps(obj, indent=2).encode('utf-8')
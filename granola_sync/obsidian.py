@@ -5,13 +5,15 @@ Handles creation of properly formatted Obsidian notes with YAML frontmatter,
 safe filename generation, and content structure optimization.
 """
 
-import json
+import hashlib
+import os
 import re
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Tuple
 import logging
 
+from . import jsonio
 from .config import GranolaConfig
 
 
@@ -21,7 +23,22 @@ class ObsidianIntegration:
     def __init__(self, config: GranolaConfig):
         self.config = config
         self.logger = logging.getLogger(__name__)
-    
+
+        # Cache per-document hot-path values once instead of re-reading
+        # them from the config dicts for every synced note
+        self._unsafe_re = re.compile(config.get_safe_filename_pattern())
+        self._collapse_re = re.compile(r'[-\s]+')
+        # Values containing these need the real YAML emitter; everything
+        # else quotes cleanly on the frontmatter fast path
+        self._yaml_unsafe_re = re.compile(r'["\\\n\r]')
+        self._frontmatter_fields = list(config.get_frontmatter_fields())
+        self._filename_format = config.documents.get('filename_format', '{date}-{title}.md')
+        self._max_filename_length = config.documents.get('max_filename_length', 255)
+
+        # Names of markdown files in the vault, scanned lazily and kept
+        # current by save_note; serves both existence checks and counts
+        self._vault_files: Optional[set] = None
+
     def create_note_from_document(
         self, 
         document: Dict[str, Any], 
@@ -57,16 +74,16 @@ class ObsidianIntegration:
             document_list_id=document_list_id
         )
         
-        # Build note content
-        content = self._build_note_content(
+        # Build note content as chunks and join once, so large
+        # transcripts are never copied through intermediate strings
+        content_parts = self._build_note_content(
             title=title,
             transcript_content=transcript_content,
             document_list_name=document_list_name
         )
-        
-        # Combine frontmatter and content
-        full_note = self._format_yaml_frontmatter(frontmatter) + content
-        
+
+        full_note = ''.join([self._format_yaml_frontmatter(frontmatter)] + content_parts)
+
         return full_note, title, meeting_date
     
     def _extract_meeting_date(self, created_at: str) -> str:
@@ -97,7 +114,7 @@ class ObsidianIntegration:
         frontmatter = {}
         
         # Add fields based on configuration
-        for field in self.config.get_frontmatter_fields():
+        for field in self._frontmatter_fields:
             if field == 'title':
                 frontmatter['title'] = title
             elif field == 'date':
@@ -124,73 +141,88 @@ class ObsidianIntegration:
     
     def _format_yaml_frontmatter(self, frontmatter: Dict[str, Any]) -> str:
         """Format frontmatter dictionary as YAML header"""
-        yaml_header = "---\n"
-        
+        # Drop empty values and check whether any scalar needs real
+        # YAML escaping (quotes, backslashes, newlines)
+        fields: Dict[str, Any] = {}
+        needs_emitter = False
+
         for key, value in frontmatter.items():
-            if isinstance(value, list):
-                if value:  # Only include non-empty lists
-                    yaml_header += f"{key}: {json.dumps(value)}\n"
-            elif value:  # Only include non-empty values
-                # Escape quotes in string values
-                if isinstance(value, str):
-                    escaped_value = value.replace('"', '\\"')
-                    yaml_header += f'{key}: "{escaped_value}"\n'
+            if not value:  # Only include non-empty values/lists
+                continue
+            fields[key] = value
+            if isinstance(value, str) and self._yaml_unsafe_re.search(value):
+                needs_emitter = True
+
+        if not needs_emitter:
+            # Fast path: plain scalars quote cleanly, and JSON-encoded
+            # lists are valid YAML flow sequences
+            lines = []
+            for key, value in fields.items():
+                if isinstance(value, list):
+                    lines.append(f"{key}: {jsonio.dumps_compact(value)}")
                 else:
-                    yaml_header += f'{key}: "{value}"\n'
-        
-        yaml_header += "---\n\n"
-        return yaml_header
+                    lines.append(f'{key}: "{value}"')
+            return "---\n" + "\n".join(lines) + "\n---\n\n"
+
+        # Awkward values go through PyYAML's emitter (C-accelerated
+        # when libyaml is available) for correct escaping
+        import yaml
+        body = yaml.dump(
+            fields,
+            Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper),
+            default_flow_style=False,
+            sort_keys=False,
+            allow_unicode=True
+        )
+        return "---\n" + body + "---\n\n"
     
     def _build_note_content(
         self,
         title: str,
         transcript_content: Optional[Dict[str, Any]],
         document_list_name: str = ""
-    ) -> str:
-        """Build the main content section of the note"""
-        content = f"# {title}\n\n"
-        
+    ) -> List[str]:
+        """Build the main content section of the note as a list of chunks"""
+        parts = [f"# {title}\n\n"]
+
         # Add meeting series information if configured
         if document_list_name and self.config.obsidian.get('include_meeting_series', True):
-            content += f"**Meeting Series:** {document_list_name}\n\n"
-        
+            parts.append(f"**Meeting Series:** {document_list_name}\n\n")
+
         # Add transcript or placeholder
         if transcript_content and transcript_content.get('text'):
-            content += f"{self.config.documents['transcript_section_header']}\n\n"
-            content += transcript_content['text']
-            content += "\n\n"
-            
+            parts.append(f"{self.config.documents['transcript_section_header']}\n\n")
+            parts.append(transcript_content['text'])
+            parts.append("\n\n")
+
             # Add speaker statistics if available and configured
-            if (transcript_content.get('speaker_stats') and 
+            if (transcript_content.get('speaker_stats') and
                 self.config.obsidian.get('include_participant_count', False)):
-                content += self._format_speaker_stats(transcript_content['speaker_stats'])
+                parts.append(self._format_speaker_stats(transcript_content['speaker_stats']))
         else:
-            content += f"{self.config.documents['notes_section_header']}\n\n"
-            content += f"{self.config.documents['no_transcript_message']}\n\n"
-        
-        return content
+            parts.append(f"{self.config.documents['notes_section_header']}\n\n")
+            parts.append(f"{self.config.documents['no_transcript_message']}\n\n")
+
+        return parts
     
     def _format_speaker_stats(self, speaker_stats: Dict[str, Dict[str, int]]) -> str:
         """Format speaker statistics section"""
         if not speaker_stats:
             return ""
         
-        stats_content = "### Speaking Summary\n\n"
-        
         # Sort speakers by word count (descending)
         sorted_speakers = sorted(
-            speaker_stats.items(), 
-            key=lambda x: x[1]['word_count'], 
+            speaker_stats.items(),
+            key=lambda x: x[1]['word_count'],
             reverse=True
         )
-        
-        for speaker, stats in sorted_speakers:
-            word_count = stats['word_count']
-            segment_count = stats['segment_count']
-            stats_content += f"- **{speaker}**: {word_count} words in {segment_count} segments\n"
-        
-        stats_content += "\n"
-        return stats_content
+
+        lines = [
+            f"- **{speaker}**: {stats['word_count']} words in {stats['segment_count']} segments"
+            for speaker, stats in sorted_speakers
+        ]
+
+        return "### Speaking Summary\n\n" + "\n".join(lines) + "\n\n"
     
     def create_safe_filename(self, title: str, date: str) -> str:
         """Create a filesystem-safe filename from title and date"""
@@ -199,17 +231,16 @@ class ObsidianIntegration:
             title = "Untitled"
         
         # Remove unsafe characters
-        pattern = self.config.get_safe_filename_pattern()
-        safe_title = re.sub(pattern, '', title).strip()
-        safe_title = re.sub(r'[-\s]+', '-', safe_title)
-        
+        safe_title = self._unsafe_re.sub('', title).strip()
+        safe_title = self._collapse_re.sub('-', safe_title)
+
         # Ensure reasonable length
-        max_length = self.config.documents.get('max_filename_length', 255)
+        max_length = self._max_filename_length
         if len(safe_title) > max_length - 20:  # Leave room for date and extension
             safe_title = safe_title[:max_length - 20]
-        
+
         # Build filename based on format configuration
-        filename_format = self.config.documents.get('filename_format', '{date}-{title}.md')
+        filename_format = self._filename_format
         
         if date and '{date}' in filename_format:
             filename = filename_format.format(date=date, title=safe_title)
@@ -234,17 +265,24 @@ class ObsidianIntegration:
             update_existing = self.config.sync.get('update_existing_files', True)
         
         output_path = self.config.paths.obsidian_vault / filename
-        
+
         # Check if file exists and handle accordingly
-        if output_path.exists():
+        is_new_file = not self.note_exists(filename)
+        if not is_new_file:
             if not update_existing:
                 self.logger.info(f"File exists and updates disabled, skipping: {filename}")
                 return False
-            
+
+            # Skip the backup and rewrite entirely when nothing changed -
+            # the common case on re-syncs of unmodified meetings
+            if self._content_unchanged(output_path, content):
+                self.logger.debug(f"Content unchanged, skipping write: {filename}")
+                return True
+
             # Create backup if configured
             if self.config.sync.get('create_backup_before_update', False):
                 self._create_file_backup(output_path)
-            
+
             self.logger.debug(f"Updating existing file: {filename}")
         else:
             self.logger.debug(f"Creating new file: {filename}")
@@ -255,14 +293,36 @@ class ObsidianIntegration:
                 self.logger.info(f"[DRY RUN] Would save note to: {output_path}")
                 return True
             else:
-                with open(output_path, 'w', encoding='utf-8') as f:
+                with open(output_path, 'w', encoding='utf-8', buffering=1 << 16) as f:
                     f.write(content)
+                if is_new_file:
+                    self._vault_file_names().add(filename)
                 return True
                 
         except Exception as e:
             self.logger.error(f"Failed to save note {filename}: {e}")
             return False
     
+    def _content_unchanged(self, file_path: Path, content: str) -> bool:
+        """Check whether the on-disk note already matches the new content"""
+        new_bytes = content.encode('utf-8')
+
+        try:
+            # Cheap size check first; hash-compare in chunks to cap memory
+            if file_path.stat().st_size != len(new_bytes):
+                return False
+
+            new_digest = hashlib.blake2b(new_bytes, digest_size=16).digest()
+            existing_hash = hashlib.blake2b(digest_size=16)
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 16), b''):
+                    existing_hash.update(chunk)
+
+            return existing_hash.digest() == new_digest
+
+        except OSError:
+            return False
+
     def _create_file_backup(self, file_path: Path):
         """Create a backup of existing file"""
         if not file_path.exists():
@@ -280,12 +340,28 @@ class ObsidianIntegration:
         except Exception as e:
             self.logger.warning(f"Failed to create backup for {file_path}: {e}")
     
+    def _vault_file_names(self) -> set:
+        """Get the cached set of markdown filenames in the vault, scanning once"""
+        if self._vault_files is None:
+            try:
+                # scandir avoids the per-entry lstat that glob performs
+                with os.scandir(self.config.paths.obsidian_vault) as entries:
+                    self._vault_files = {entry.name for entry in entries if entry.name.endswith('.md')}
+            except OSError:
+                self._vault_files = set()
+        return self._vault_files
+
+    def note_exists(self, filename: str) -> bool:
+        """Check whether a note already exists in the vault without a stat call"""
+        return filename in self._vault_file_names()
+
     def get_total_files_count(self) -> int:
-        """Get total count of markdown files in Obsidian vault"""
-        try:
-            return len(list(self.config.paths.obsidian_vault.glob('*.md')))
-        except Exception:
-            return 0
+        """Get total count of markdown files in Obsidian vault (cached after first scan)"""
+        return len(self._vault_file_names())
+
+    def invalidate_count(self):
+        """Drop the cached vault scan (call after external vault changes)"""
+        self._vault_files = None
     
     def validate_note_content(self, content: str) -> bool:
         """Validate note content structure and format"""
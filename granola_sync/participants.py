@@ -5,15 +5,30 @@ Handles mapping of audio sources to real participant names using
 document list information and enhanced speaker detection logic.
 """
 
-import json
+import hashlib
 import logging
-from typing import Dict, List, Any, Optional, Set, Tuple
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Any, Optional, Set, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from . import jsonio
 from .config import GranolaConfig
 
 
+# Counting matches avoids the throwaway word list that str.split builds
+# for every segment
+_WORD_RE = re.compile(r'\S+')
+
+
+def _count_words(text: str) -> int:
+    """Count whitespace-separated words without materializing them"""
+    return sum(1 for _ in _WORD_RE.finditer(text))
+
+
 class ParticipantManager:
     """Manages participant detection and speaker identification"""
     
@@ -22,27 +37,61 @@ class ParticipantManager:
         self.logger = logging.getLogger(__name__)
         self._document_mapping: Optional[Dict[str, Dict[str, str]]] = None
         self._participant_data: Optional[Dict[str, List[Dict[str, Any]]]] = None
-        
+        self._mapping_lock = threading.RLock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        # Participant names already resolved for a document list
+        self._participants_by_list: Dict[str, List[str]] = {}
+        # Bound once; fallback paths hand out fresh copies
+        self._fallback = tuple(config.sync['fallback_participants'])
+
     def load_document_mapping(self, api_client) -> Dict[str, Dict[str, str]]:
-        """Load or create document to list mapping with smart refresh"""
-        mapping_path = self.config.paths.document_mapping
-        
-        # Check if mapping exists and is fresh
-        if self._should_refresh_mapping():
-            self.logger.info("Document mapping is stale or missing, refreshing...")
+        """
+        Load document to list mapping, refreshing stale data in the background
+
+        A stale-but-usable on-disk mapping is served immediately while a
+        daemon thread rebuilds it, so the sync never blocks on the
+        document-lists API just because the cache aged out.
+        """
+        mapping = self._read_mapping_file()
+
+        if mapping is None:
+            # No usable cache - build synchronously
+            self.logger.info("Document mapping missing or unreadable, creating new one...")
             mapping = self._create_document_mapping(api_client)
+        elif self._should_refresh_mapping():
+            self.logger.info(f"Document mapping is stale, serving {len(mapping)} cached entries and refreshing in background")
+            self._start_background_refresh(api_client)
         else:
-            # Load existing mapping
+            self.logger.info(f"Loaded document mapping for {len(mapping)} documents")
+
+        with self._mapping_lock:
+            self._document_mapping = mapping
+        return mapping
+
+    def _read_mapping_file(self) -> Optional[Dict[str, Dict[str, str]]]:
+        """Load the on-disk mapping, or None if missing/corrupt"""
+        try:
+            return jsonio.loads(self.config.paths.document_mapping.read_bytes())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _start_background_refresh(self, api_client):
+        """Rebuild the mapping on a daemon thread and swap it in when done"""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+
+        def _refresh():
             try:
-                with open(mapping_path, 'r') as f:
-                    mapping = json.load(f)
-                self.logger.info(f"Loaded document mapping for {len(mapping)} documents")
-            except (FileNotFoundError, json.JSONDecodeError) as e:
-                self.logger.warning(f"Could not load document mapping: {e}, creating new one")
                 mapping = self._create_document_mapping(api_client)
-        
-        self._document_mapping = mapping
-        return mapping
+                with self._mapping_lock:
+                    self._document_mapping = mapping
+            except Exception as e:
+                self.logger.warning(f"Background mapping refresh failed: {e}")
+
+        self._refresh_thread = threading.Thread(
+            target=_refresh, daemon=True, name='mapping-refresh'
+        )
+        self._refresh_thread.start()
     
     def _should_refresh_mapping(self) -> bool:
         """Check if document mapping should be refreshed"""
@@ -95,9 +144,22 @@ class ParticipantManager:
         return mapping
     
     def _save_mapping_with_backup(self, mapping: Dict[str, Dict[str, str]]):
-        """Save mapping with automatic backup"""
+        """Save mapping with automatic backup, skipping no-op rewrites"""
         mapping_path = self.config.paths.document_mapping
-        
+
+        # Serialize first so an unchanged mapping can skip both the
+        # backup and the rewrite - the common case when a refresh finds
+        # nothing new
+        new_bytes = jsonio.dumps_indented(mapping)
+        try:
+            existing = mapping_path.read_bytes()
+            if (hashlib.blake2b(existing, digest_size=16).digest()
+                    == hashlib.blake2b(new_bytes, digest_size=16).digest()):
+                self.logger.debug("Document mapping unchanged, skipping backup and write")
+                return
+        except OSError:
+            pass
+
         # Create backup if enabled and original exists
         if self.config.data.get('auto_backup_mapping', True) and mapping_path.exists():
             backup_name = f"document_mapping_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
@@ -110,114 +172,130 @@ class ParticipantManager:
             except Exception as e:
                 self.logger.warning(f"Failed to create mapping backup: {e}")
         
-        # Save new mapping
+        # Save new mapping atomically so a concurrent reader (or a
+        # killed process) never sees a torn file
         try:
-            with open(mapping_path, 'w') as f:
-                json.dump(mapping, f, indent=2)
+            tmp_path = mapping_path.with_suffix('.json.tmp')
+            tmp_path.write_bytes(new_bytes)
+            os.replace(tmp_path, mapping_path)
         except Exception as e:
             self.logger.error(f"Failed to save document mapping: {e}")
             raise
     
     def get_participants_for_document(self, document_id: str, participant_data: Dict[str, List[Dict[str, Any]]]) -> List[str]:
         """Get participant list for a document using the mapping"""
-        if not self._document_mapping or document_id not in self._document_mapping:
-            return self.config.sync['fallback_participants']
-        
-        list_info = self._document_mapping[document_id]
+        with self._mapping_lock:
+            mapping = self._document_mapping
+
+        if not mapping or document_id not in mapping:
+            return list(self._fallback)
+
+        list_info = mapping[document_id]
         document_list_id = list_info['document_list_id']
         
         if document_list_id in participant_data:
-            participants = participant_data[document_list_id]
-            names = []
-            
-            for p in participants:
-                name = p.get('name', p.get('email', 'Unknown'))
-                if name and name not in names:
-                    names.append(name)
-            
+            cached = self._participants_by_list.get(document_list_id)
+            if cached is not None:
+                return list(cached)
+
+            # Ordered dedup in one pass instead of scanning the list
+            # for every name
+            names = list(dict.fromkeys(
+                p.get('name') or p.get('email') or 'Unknown'
+                for p in participant_data[document_list_id]
+            ))
+
             # Add "Me" to represent the user if not already present
             if "Me" not in names:
                 names.insert(0, "Me")
-            
-            return names
-        
-        return self.config.sync['fallback_participants']
+
+            self._participants_by_list[document_list_id] = names
+            return list(names)
+
+        return list(self._fallback)
     
-    def parse_transcript_with_participants(self, transcript_data: List[Dict[str, Any]], participants: List[str]) -> Optional[Dict[str, Any]]:
-        """Parse transcript data with enhanced participant mapping"""
-        if not transcript_data or not isinstance(transcript_data, list):
+    def parse_transcript_with_participants(self, transcript_data: Iterable[Dict[str, Any]], participants: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Parse transcript data with enhanced participant mapping
+
+        Accepts any iterable of segment dicts and consumes it in a
+        single pass, so callers can stream segments instead of
+        materializing the full transcript list.
+        """
+        if not transcript_data or isinstance(transcript_data, (str, bytes, dict)):
             return None
         
-        transcript_text = ""
-        speakers = set()
-        speaker_stats = {}  # Track speaking time per detected speaker
-        
-        # Enhanced speaker detection logic
-        participant_names = participants.copy()
-        
+        transcript_parts: List[str] = []
+
+        # Specialize speaker detection for this participant list once,
+        # so the per-segment work is a dict lookup instead of re-deriving
+        # the participant layout for every item
+        detect_speaker = self._make_speaker_detector(participants)
+
+        speaker_stats = defaultdict(lambda: {'word_count': 0, 'segment_count': 0})
+
         for item in transcript_data:
             if isinstance(item, dict) and 'text' in item:
                 text = item.get('text', '').strip()
                 if not text:
                     continue
-                
-                # Determine speaker from source field with enhanced logic
-                speaker = self._detect_speaker(item, participant_names, speaker_stats)
-                
-                if speaker and text:
-                    speakers.add(speaker)
-                    
-                    # Update speaker statistics
-                    if speaker not in speaker_stats:
-                        speaker_stats[speaker] = {'word_count': 0, 'segment_count': 0}
-                    
-                    speaker_stats[speaker]['word_count'] += len(text.split())
-                    speaker_stats[speaker]['segment_count'] += 1
-                    
-                    transcript_text += f"{speaker}: {text}\n\n"
-        
-        return {
-            'text': transcript_text,
-            'speakers': list(speakers),
-            'speaker_stats': speaker_stats,
-            'raw_data': transcript_data
+
+                # Determine speaker from source field
+                speaker = detect_speaker(item.get('source', 'unknown'))
+
+                # Update speaker statistics
+                stats = speaker_stats[speaker]
+                stats['word_count'] += _count_words(text)
+                stats['segment_count'] += 1
+
+                transcript_parts.append(f"{speaker}: {text}\n\n")
+
+        # speaker_stats already carries each speaker once, in the order
+        # they first spoke - no separate set to maintain
+        result = {
+            'text': ''.join(transcript_parts),
+            'speakers': list(speaker_stats),
+            'speaker_stats': dict(speaker_stats),
         }
-    
-    def _detect_speaker(self, item: Dict[str, Any], participants: List[str], speaker_stats: Dict[str, Any]) -> str:
-        """Enhanced speaker detection logic"""
-        source = item.get('source', 'unknown')
-        
-        if source == 'microphone':
-            # Microphone is typically the user
-            return participants[0] if participants else "Me"
-            
-        elif source == 'system':
-            # System audio - try to intelligently assign to other participants
-            # Use specific names only for 2-person meetings, otherwise use "Them"
-            
-            other_participants = participants[1:] if len(participants) > 1 else ["Them"]
-            
-            if len(other_participants) == 1:
-                # 2-person meeting: use specific name for clarity
-                return other_participants[0]
-            else:
-                # 3+ person meeting: use "Them" to maintain Me/Them dichotomy
-                return "Them"
-            
-        else:
-            # Unknown source, try to map to a participant name or fall back
-            source_title = source.title()
-            if source_title in participants:
-                return source_title
-            
-            return "Unknown"
-    
+
+        # Holding the raw segment list keeps the whole transcript alive
+        # through note rendering, so it is opt-in for debugging only
+        if self.config.sync.get('include_raw_data', False):
+            result['raw_data'] = transcript_data
+
+        return result
+
+    @staticmethod
+    def _make_speaker_detector(participants: List[str]):
+        """
+        Build a source -> speaker function specialized to one participant list
+
+        Microphone is typically the user; system audio maps to the other
+        participant's name in 2-person meetings and keeps the Me/Them
+        dichotomy otherwise. Unknown sources fall back to a matching
+        participant name.
+        """
+        other_participants = participants[1:] if len(participants) > 1 else ["Them"]
+        source_map = {
+            'microphone': participants[0] if participants else "Me",
+            'system': other_participants[0] if len(other_participants) == 1 else "Them",
+        }
+        title_map = {p.title(): p for p in participants}
+
+        def detect(source: str) -> str:
+            return source_map.get(source) or title_map.get(source.title(), 'Unknown')
+
+        return detect
+
     def get_document_list_info(self, document_id: str) -> Tuple[str, str]:
         """Get document list name and ID for a document"""
-        if not self._document_mapping or document_id not in self._document_mapping:
+        with self._mapping_lock:
+            mapping = self._document_mapping
+
+        if not mapping or document_id not in mapping:
             return "", ""
-        
-        list_info = self._document_mapping[document_id]
+
+        list_info = mapping[document_id]
         return list_info.get('document_list_name', ''), list_info.get('document_list_id', '')
     
     def cleanup_old_backups(self):
@@ -227,33 +305,46 @@ class ParticipantManager:
             
         backup_dir = self.config.paths.backup_directory
         retention_days = self.config.data.get('backup_retention_days', 30)
-        cutoff_date = datetime.now() - timedelta(days=retention_days)
-        
+        cutoff_ts = (datetime.now() - timedelta(days=retention_days)).timestamp()
+
         try:
-            for backup_file in backup_dir.glob('document_mapping_backup_*.json'):
-                if datetime.fromtimestamp(backup_file.stat().st_mtime) < cutoff_date:
-                    backup_file.unlink()
-                    self.logger.debug(f"Removed old backup: {backup_file}")
+            # scandir caches stat results from the directory read, so
+            # this is one syscall per entry instead of glob + stat
+            with os.scandir(backup_dir) as entries:
+                for entry in entries:
+                    if (entry.name.startswith('document_mapping_backup_')
+                            and entry.name.endswith('.json')
+                            and entry.stat().st_mtime < cutoff_ts):
+                        os.unlink(entry.path)
+                        self.logger.debug(f"Removed old backup: {entry.path}")
         except Exception as e:
             self.logger.warning(f"Error during backup cleanup: {e}")
     
+    def is_fallback(self, participants: List[str]) -> bool:
+        """Check whether a participant list is just the configured fallback"""
+        return tuple(participants) == self._fallback
+
     def validate_participants(self, participants: List[str]) -> List[str]:
         """Validate and clean up participant list"""
         if not participants:
-            return self.config.sync['fallback_participants']
-        
-        # Remove empty or invalid participants
+            return list(self._fallback)
+
+        # One pass: strip once, keep reasonable-length names, and note
+        # "Me" separately so it can lead the result without a remove/insert shuffle
         valid_participants = []
+        has_me = False
         for p in participants:
-            if isinstance(p, str) and p.strip() and len(p.strip()) <= 50:  # Reasonable name length limit
-                valid_participants.append(p.strip())
-        
-        if not valid_participants:
-            return self.config.sync['fallback_participants']
-        
-        # Ensure "Me" is first if present
-        if "Me" in valid_participants:
-            valid_participants.remove("Me")
-            valid_participants.insert(0, "Me")
-        
-        return valid_participants
\ No newline at end of file
+            if not isinstance(p, str):
+                continue
+            name = p.strip()
+            if not 1 <= len(name) <= 50:  # Reasonable name length limit
+                continue
+            if name == "Me":
+                has_me = True
+            else:
+                valid_participants.append(name)
+
+        if has_me:
+            return ["Me"] + valid_participants
+
+        return valid_participants or list(self._fallback)
\ No newline at end of file
@@ -5,17 +5,47 @@ Coordinates all components to perform intelligent, robust syncing of
 Granola transcripts to Obsidian with enhanced error handling and monitoring.
 """
 
+import functools
 import logging
-import time
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional, Dict, Any, List, Tuple
 
 from .config import GranolaConfig
-from .api import GranolaAPI, GranolaAPIError  
+from .api import GranolaAPI, GranolaAPIError
 from .participants import ParticipantManager
 from .obsidian import ObsidianIntegration
 
 
+# Bound once: C-level constructor, and 3.11+ parses a trailing 'Z'
+# natively so the rewrite is only needed on older interpreters
+_fromisoformat = datetime.fromisoformat
+_NEEDS_Z_REWRITE = sys.version_info < (3, 11)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_created_at(date_str: str) -> Tuple[str, str]:
+    """
+    Parse a document timestamp into (display, date-only) strings
+
+    Cached because documents synced in one run frequently share
+    timestamps, and both strings come from a single parse.
+    """
+    if not date_str:
+        return 'Unknown', ""
+
+    try:
+        if _NEEDS_Z_REWRITE and date_str.endswith('Z'):
+            date_str = date_str[:-1] + '+00:00'
+        dt = _fromisoformat(date_str)
+        return dt.strftime('%Y-%m-%d %H:%M'), dt.strftime('%Y-%m-%d')
+    except ValueError:
+        display = date_str[:19] if len(date_str) >= 19 else date_str
+        date_only = date_str[:10] if len(date_str) >= 10 else ""
+        return display, date_only
+
+
 class SyncStats:
     """Track sync operation statistics"""
     
@@ -74,6 +104,7 @@ class GranolaSync:
         self.stats = SyncStats()
         self._participant_data: Optional[Dict[str, List[Dict[str, Any]]]] = None
         self._document_mapping: Optional[Dict[str, Dict[str, str]]] = None
+        self._final_total_files: Optional[int] = None
     
     def _setup_logging(self):
         """Configure logging based on configuration"""
@@ -116,7 +147,11 @@ class GranolaSync:
             
             # Cleanup old data
             self._cleanup()
-            
+
+            # Snapshot the vault count once; completion logging and the
+            # result dict both report the same number
+            self._final_total_files = self.obsidian.get_total_files_count()
+
             # Log completion
             self._log_completion()
             
@@ -135,12 +170,16 @@ class GranolaSync:
         self.logger.info("📋 Initializing sync components...")
         
         try:
-            # Load participant data
-            self._participant_data = self.api.load_participant_data()
-            
-            # Load/refresh document mapping
-            self._document_mapping = self.participants.load_document_mapping(self.api)
-            
+            # Participant preferences (local file) and the document
+            # mapping (potentially a document-lists API call) are
+            # independent, so load them in parallel
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                participant_future = executor.submit(self.api.load_participant_data)
+                mapping_future = executor.submit(self.participants.load_document_mapping, self.api)
+
+                self._participant_data = participant_future.result()
+                self._document_mapping = mapping_future.result()
+
             self.logger.info("✅ Initialization complete")
             
         except Exception as e:
@@ -166,31 +205,49 @@ class GranolaSync:
     def _process_documents(self, documents: List[Dict[str, Any]]):
         """Process each document for sync"""
         self.logger.info(f"🔄 Processing {len(documents)} documents...")
-        
-        for i, document in enumerate(documents, 1):
-            try:
-                self._process_single_document(document, i, len(documents))
-                self.stats.documents_processed += 1
-                
-            except Exception as e:
-                self.stats.documents_failed += 1
-                self.logger.error(f"Error processing document {i}: {e}")
-                
-                if not self.config.should_continue_on_error('document'):
-                    raise
-            
-            # Brief pause between documents
-            time.sleep(self.config.api.request_delay)
-    
-    def _process_single_document(self, document: Dict[str, Any], index: int, total: int):
+
+        # Submit every transcript fetch up front, then process documents
+        # in order while the pool keeps fetching ahead - network I/O
+        # overlaps the CPU/disk work of rendering and saving notes. The
+        # client-level throttle still enforces the global request rate.
+        doc_ids = [doc.get('id') for doc in documents if doc.get('id')]
+        max_workers = min(self.config.api.concurrency, max(len(doc_ids), 1))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            transcript_futures = {
+                doc_id: executor.submit(self.api.fetch_transcript, doc_id)
+                for doc_id in doc_ids
+            }
+
+            for i, document in enumerate(documents, 1):
+                try:
+                    future = transcript_futures.get(document.get('id', ''))
+                    raw_transcript = future.result() if future else None
+                    self._process_single_document(document, i, len(documents), raw_transcript)
+                    self.stats.documents_processed += 1
+
+                except Exception as e:
+                    self.stats.documents_failed += 1
+                    self.logger.error(f"Error processing document {i}: {e}")
+
+                    if not self.config.should_continue_on_error('document'):
+                        raise
+
+    def _process_single_document(
+        self,
+        document: Dict[str, Any],
+        index: int,
+        total: int,
+        raw_transcript: Optional[List[Dict[str, Any]]]
+    ):
         """Process a single document"""
         title = document.get('title') or 'Untitled'
         doc_id = document.get('id', '')
         created_at = document.get('created_at', 'N/A')
-        
-        # Format creation date for display
-        created_display = self._format_display_date(created_at)
-        
+
+        # One cached parse yields both the display form and the date
+        created_display, meeting_date = _parse_created_at(created_at)
+
         self.logger.info(f"📋 Document {index}/{total}: {title}")
         self.logger.debug(f"   - Created: {created_display}")
         
@@ -200,23 +257,21 @@ class GranolaSync:
         )
         
         # Show enhanced participant info if available
-        if len(participants) > 2 or participants != self.config.sync['fallback_participants']:
+        if len(participants) > 2 or not self.participants.is_fallback(participants):
             self.logger.info(f"   - Participants: {', '.join(participants)}")
         
         # Create filename
-        meeting_date = self._extract_date(created_at)
         filename = self.obsidian.create_safe_filename(title, meeting_date)
-        output_path = self.config.paths.obsidian_vault / filename
-        
-        # Check if updating existing file
-        is_update = output_path.exists()
+
+        # Check if updating existing file (cached scan, no stat call)
+        is_update = self.obsidian.note_exists(filename)
         if is_update:
             self.logger.debug(f"   🔄 Updating: {filename}")
         else:
             self.logger.debug(f"   ✨ Creating: {filename}")
         
-        # Fetch transcript
-        transcript_content = self._fetch_and_parse_transcript(doc_id, participants)
+        # Parse the prefetched transcript
+        transcript_content = self._parse_transcript(raw_transcript, participants)
         
         # Get document list information
         document_list_name, document_list_id = self.participants.get_document_list_info(doc_id)
@@ -245,11 +300,9 @@ class GranolaSync:
             self.stats.documents_failed += 1
             raise Exception(f"Failed to save note: {filename}")
     
-    def _fetch_and_parse_transcript(self, document_id: str, participants: List[str]) -> Optional[Dict[str, Any]]:
-        """Fetch and parse transcript for a document"""
+    def _parse_transcript(self, raw_transcript: Optional[List[Dict[str, Any]]], participants: List[str]) -> Optional[Dict[str, Any]]:
+        """Parse a prefetched raw transcript for a document"""
         try:
-            raw_transcript = self.api.fetch_transcript(document_id)
-            
             if raw_transcript:
                 parsed_transcript = self.participants.parse_transcript_with_participants(
                     raw_transcript, participants
@@ -279,25 +332,11 @@ class GranolaSync:
     
     def _format_display_date(self, date_str: str) -> str:
         """Format date string for display"""
-        if not date_str:
-            return 'Unknown'
-        
-        try:
-            dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            return dt.strftime('%Y-%m-%d %H:%M')
-        except ValueError:
-            return date_str[:19] if len(date_str) >= 19 else date_str
-    
+        return _parse_created_at(date_str)[0]
+
     def _extract_date(self, date_str: str) -> str:
         """Extract date portion from datetime string"""
-        if not date_str:
-            return ""
-        
-        try:
-            dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            return dt.strftime('%Y-%m-%d')
-        except ValueError:
-            return date_str[:10] if len(date_str) >= 10 else ""
+        return _parse_created_at(date_str)[1]
     
     def _cleanup(self):
         """Perform cleanup operations"""
@@ -318,15 +357,21 @@ class GranolaSync:
         self.logger.info(f"   📊 Success Rate: {stats['success_rate_percent']}%")
         self.logger.info(f"   ⏱️ Duration: {stats['duration_seconds']}s")
         
-        total_files = self.obsidian.get_total_files_count()
+        total_files = self._total_files()
         self.logger.info(f"   📁 Total files: {total_files}")
     
+    def _total_files(self) -> int:
+        """Vault file count for reporting, computed at most once per run"""
+        if self._final_total_files is None:
+            self._final_total_files = self.obsidian.get_total_files_count()
+        return self._final_total_files
+
     def _create_sync_result(self, success: bool, error: Optional[str] = None) -> Dict[str, Any]:
         """Create sync result dictionary"""
         result = {
             'success': success,
             'stats': self.stats.summary(),
-            'total_files': self.obsidian.get_total_files_count()
+            'total_files': self._total_files()
         }
         
         if error:
@@ -343,7 +388,10 @@ class GranolaSync:
 def run_granola_sync(config_path: Optional[str] = None) -> Dict[str, Any]:
     """Run Granola sync with specified configuration"""
     sync = GranolaSync(config_path)
-    return sync.run_sync()
+    try:
+        return sync.run_sync()
+    finally:
+        sync.api.close()
 
 
 if __name__ == "__main__":
@@ -2,16 +2,85 @@
 """
 Setup script for Granola sync automation
 Helps configure cron jobs for regular syncing
+
+Deliberately stdlib-only: crontab manipulation goes through one read
+(_mutate_crontab) and one locked write (_commit_crontab) rather than
+the python-crontab library, so the setup script stays runnable before
+any dependencies are installed.
 """
 
+import fcntl
 import subprocess
 import os
+import sys
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
 
+# Resolved once at import; every menu action reuses these instead of
+# re-deriving the script directory per call
+SCRIPT_DIR = Path(__file__).resolve().parent
+RUN_SYNC = SCRIPT_DIR / "run_sync.sh"
+RUN_SYNC_STR = str(RUN_SYNC)
+LOG_DIR = SCRIPT_DIR / "logs"
+
+# Every line this tool installs carries the marker comment, so managed
+# entries are recognized by an exact suffix check instead of scanning
+# each line for the script path
+MARKER = "# granola-sync-managed"
+
+# The path never changes after import, so the schedule lines and their
+# human-readable labels are fully known here
+CRON_SCHEDULES = {
+    "1": f"0 * * * * {RUN_SYNC} {MARKER}",      # Every hour
+    "2": f"0 */4 * * * {RUN_SYNC} {MARKER}",    # Every 4 hours
+    "3": f"0 9,17 * * 1-5 {RUN_SYNC} {MARKER}", # Twice daily on weekdays (9am, 5pm)
+    "4": f"0 9 * * * {RUN_SYNC} {MARKER}",      # Once daily at 9am
+    "5": f"0 9 * * 1 {RUN_SYNC} {MARKER}",      # Weekly on Monday at 9am
+}
+
+FREQ_LABELS = {
+    "1": "every hour",
+    "2": "every 4 hours",
+    "3": "twice daily on weekdays",
+    "4": "once daily",
+    "5": "weekly",
+}
+
+# Menus are static, so each redraw is one pre-joined write instead of a
+# print call per line
+MAIN_MENU = "\n".join([
+    "",
+    "Options:",
+    "1. Set up automatic syncing",
+    "2. Remove automatic syncing",
+    "3. Show current sync jobs",
+    "4. Test sync script",
+    "5. Exit",
+    "",
+])
+
+FREQ_MENU = "\n".join([
+    "",
+    "📅 Choose sync frequency:",
+    "1. Every hour",
+    "2. Every 4 hours",
+    "3. Twice daily (9am, 5pm) on weekdays",
+    "4. Once daily (9am)",
+    "5. Weekly (Monday 9am)",
+    "",
+])
+
 def get_current_crontab():
     """Get current crontab entries"""
     try:
-        result = subprocess.run(['crontab', '-l'], capture_output=True, text=True)
+        # Only stdout matters; discarding stderr also hides the noisy
+        # "no crontab for user" message on first run
+        result = subprocess.run(
+            ['crontab', '-l'],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, check=False
+        )
         if result.returncode == 0:
             return result.stdout.strip()
         else:
@@ -20,100 +89,133 @@ def get_current_crontab():
         print("❌ crontab command not found. Please install cron.")
         return None
 
-def add_cron_job(frequency_choice):
-    """Add cron job based on frequency choice"""
-    script_path = Path(__file__).parent.absolute() / "run_sync.sh"
-    
-    # Cron schedules
-    schedules = {
-        "1": f"0 * * * * {script_path}",      # Every hour
-        "2": f"0 */4 * * * {script_path}",    # Every 4 hours
-        "3": f"0 9,17 * * 1-5 {script_path}", # Twice daily on weekdays (9am, 5pm)
-        "4": f"0 9 * * * {script_path}",      # Once daily at 9am
-        "5": f"0 9 * * 1 {script_path}",      # Weekly on Monday at 9am
-    }
-    
-    if frequency_choice not in schedules:
-        print("❌ Invalid frequency choice")
+@contextmanager
+def _crontab_lock():
+    """
+    Hold an exclusive lock around crontab read-modify-write
+
+    Two concurrent runs would otherwise race between reading the
+    crontab and writing it back, silently dropping one side's change.
+    The second invocation exits fast rather than waiting.
+    """
+    lock_path = Path(tempfile.gettempdir()) / "granola_sync.crontab.lock"
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            print("⚠️  Another setup run is modifying the crontab; try again shortly")
+            sys.exit(0)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+def _commit_crontab(new_text):
+    """Write the full crontab in one shot; returns True on success"""
+    try:
+        result = subprocess.run(
+            ['crontab', '-'], input=new_text, text=True, timeout=10, check=False
+        )
+        return result.returncode == 0
+    except subprocess.TimeoutExpired:
+        print("❌ crontab did not accept input within 10 seconds")
         return False
-    
-    cron_entry = schedules[frequency_choice]
-    current_crontab = get_current_crontab()
-    
-    if current_crontab is None:
+    except FileNotFoundError:
+        print("❌ crontab command not found. Please install cron.")
         return False
-    
-    # Check if entry already exists
-    if str(script_path) in current_crontab:
-        print("⚠️  Granola sync job already exists in crontab")
-        print("Current entry found. Removing old entry...")
-        
-        # Remove old entries
-        lines = current_crontab.split('\n')
-        filtered_lines = [line for line in lines if str(script_path) not in line]
-        current_crontab = '\n'.join(filtered_lines)
-    
-    # Add new entry
-    if current_crontab:
-        new_crontab = current_crontab + '\n' + cron_entry
-    else:
-        new_crontab = cron_entry
-    
-    # Write to crontab
-    try:
-        process = subprocess.Popen(['crontab', '-'], stdin=subprocess.PIPE, text=True)
-        process.communicate(input=new_crontab)
-        
-        if process.returncode == 0:
-            print("✅ Cron job added successfully!")
-            return True
-        else:
-            print("❌ Failed to add cron job")
+
+def _is_managed(line):
+    """True for lines this tool owns, including pre-marker installs"""
+    # Legacy entries predate the marker and are matched by script path
+    return line.rstrip().endswith(MARKER) or RUN_SYNC_STR in line
+
+def _partition_crontab(lines, match):
+    """Split crontab lines into (matching, other) in a single pass"""
+    matching, other = [], []
+    for line in lines:
+        (matching if match(line) else other).append(line)
+    return matching, other
+
+def _mutate_crontab(transform):
+    """
+    Read the crontab once, apply transform to its lines, write once
+
+    transform receives the current lines and returns the new lines, or
+    None to leave the crontab untouched. Returns True for a committed
+    write, None for a successful no-op, False on failure. The whole
+    read-modify-write runs under the crontab lock.
+    """
+    with _crontab_lock():
+        current_crontab = get_current_crontab()
+        if current_crontab is None:
             return False
-    except Exception as e:
-        print(f"❌ Error setting up cron job: {e}")
+
+        lines = current_crontab.split('\n') if current_crontab else []
+        new_lines = transform(lines)
+        if new_lines is None:
+            return None
+
+        return _commit_crontab('\n'.join(new_lines))
+
+def _rewrite_crontab(match, new_entry=None):
+    """
+    Drop lines matching the predicate and optionally append a replacement
+
+    The single code path serving both add and remove: with new_entry it
+    replaces any managed lines, without it it removes them (skipping the
+    write when there was nothing to remove). Passes through
+    _mutate_crontab's tri-state result: True written, None no-op,
+    False failure.
+    """
+    def transform(lines):
+        existing, other = _partition_crontab(lines, match)
+        if new_entry is not None:
+            if existing:
+                print("⚠️  Granola sync job already exists in crontab")
+                print("Current entry found. Removing old entry...")
+            return other + [new_entry]
+        if not existing:
+            print("ℹ️  No Granola sync jobs found in crontab")
+            return None
+        return other
+
+    return _mutate_crontab(transform)
+
+def add_cron_job(frequency_choice):
+    """Add cron job based on frequency choice"""
+    if frequency_choice not in CRON_SCHEDULES:
+        print("❌ Invalid frequency choice")
         return False
 
+    if _rewrite_crontab(_is_managed, CRON_SCHEDULES[frequency_choice]):
+        print("✅ Cron job added successfully!")
+        return True
+
+    print("❌ Failed to add cron job")
+    return False
+
 def remove_cron_job():
     """Remove Granola sync cron jobs"""
-    script_path = Path(__file__).parent.absolute() / "run_sync.sh"
-    current_crontab = get_current_crontab()
-    
-    if current_crontab is None:
-        return False
-    
-    if str(script_path) not in current_crontab:
-        print("ℹ️  No Granola sync jobs found in crontab")
+    result = _rewrite_crontab(_is_managed)
+    if result is None:
+        # Nothing installed; the transform already said so
         return True
-    
-    # Remove entries
-    lines = current_crontab.split('\n')
-    filtered_lines = [line for line in lines if str(script_path) not in line]
-    new_crontab = '\n'.join(filtered_lines)
-    
-    try:
-        process = subprocess.Popen(['crontab', '-'], stdin=subprocess.PIPE, text=True)
-        process.communicate(input=new_crontab)
-        
-        if process.returncode == 0:
-            print("✅ Cron job removed successfully!")
-            return True
-        else:
-            print("❌ Failed to remove cron job")
-            return False
-    except Exception as e:
-        print(f"❌ Error removing cron job: {e}")
-        return False
+    if result:
+        print("✅ Cron job removed successfully!")
+        return True
+
+    print("❌ Failed to remove cron job")
+    return False
 
 def show_current_jobs():
     """Show current cron jobs related to Granola sync"""
-    script_path = Path(__file__).parent.absolute() / "run_granola_sync.sh"
     current_crontab = get_current_crontab()
-    
+
     if current_crontab is None:
         return
-    
-    granola_jobs = [line for line in current_crontab.split('\n') if str(script_path) in line]
+
+    granola_jobs, _ = _partition_crontab(current_crontab.split('\n'), _is_managed)
     
     if granola_jobs:
         print("📋 Current Granola sync cron jobs:")
@@ -128,39 +230,23 @@ def main():
     print("=" * 40)
     
     while True:
-        print("\nOptions:")
-        print("1. Set up automatic syncing")
-        print("2. Remove automatic syncing") 
-        print("3. Show current sync jobs")
-        print("4. Test sync script")
-        print("5. Exit")
-        
-        choice = input("\nEnter your choice (1-5): ").strip()
-        
+        sys.stdout.write(MAIN_MENU)
+        sys.stdout.flush()
+
+        choice = input("Enter your choice (1-5): ").strip()
+
         if choice == "1":
-            print("\n📅 Choose sync frequency:")
-            print("1. Every hour")
-            print("2. Every 4 hours") 
-            print("3. Twice daily (9am, 5pm) on weekdays")
-            print("4. Once daily (9am)")
-            print("5. Weekly (Monday 9am)")
-            
-            freq_choice = input("\nEnter frequency choice (1-5): ").strip()
+            sys.stdout.write(FREQ_MENU)
+            sys.stdout.flush()
+
+            freq_choice = input("Enter frequency choice (1-5): ").strip()
             
-            if freq_choice in ["1", "2", "3", "4", "5"]:
+            if freq_choice in FREQ_LABELS:
                 if add_cron_job(freq_choice):
-                    frequencies = {
-                        "1": "every hour",
-                        "2": "every 4 hours",
-                        "3": "twice daily on weekdays",
-                        "4": "once daily",
-                        "5": "weekly"
-                    }
-                    print(f"🎉 Granola sync will now run {frequencies[freq_choice]}")
+                    print(f"🎉 Granola sync will now run {FREQ_LABELS[freq_choice]}")
                     
                     # Show log location
-                    log_dir = Path(__file__).parent.absolute() / "logs"
-                    print(f"📁 Logs will be saved to: {log_dir}")
+                    print(f"📁 Logs will be saved to: {LOG_DIR}")
                 else:
                     print("❌ Failed to set up automation")
             else:
@@ -174,9 +260,8 @@ def main():
         
         elif choice == "4":
             print("🧪 Testing sync script...")
-            script_path = Path(__file__).parent.absolute() / "run_granola_sync.sh"
             try:
-                result = subprocess.run([str(script_path)], capture_output=True, text=True)
+                result = subprocess.run([RUN_SYNC_STR], capture_output=True, text=True, check=False)
                 if result.returncode == 0:
                     print("✅ Test completed successfully!")
                 else: